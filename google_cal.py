@@ -4,15 +4,15 @@
 calendar.py: Interface that supports Google Calendar operations.
 """
 
-from dataclasses import dataclass, asdict, fields
+from dataclasses import dataclass, field, fields
 from datetime import datetime, timezone
-from typing import Self
-import hashlib
+from typing import Any, ClassVar, Self
 import json
 import sys
 
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
+
+# Maximum number of calls Google accepts in a single batch request.
+BATCH_SIZE = 50
 
 
 class GenericError(Exception):
@@ -39,42 +39,59 @@ def eprint(*args, **kwargs):
   print(*args, file=sys.stderr, **kwargs)
 
 
-@dataclass
+@dataclass(slots=True)
 class CalDateTime:
   dateTime: str
   timeZone: str = 'UTC'
+  _dt: datetime|None = field(default=None, init=False, repr=False, compare=False)
 
   def get_time(self) -> datetime:
-    return datetime.fromisoformat(self.dateTime)
+    if self._dt is None:
+      self._dt = datetime.fromisoformat(self.dateTime)
+    return self._dt
+
+  def to_dict(self) -> dict:
+    return {'dateTime': self.dateTime, 'timeZone': self.timeZone}
   
   @classmethod
   def from_datetime(cls, dt: datetime, tz: str|None = None) -> Self:
-    return cls(dateTime=dt.isoformat(), timeZone=tz or 'UTC')
-
+    obj = cls(dateTime=dt.isoformat(), timeZone=tz or 'UTC')
+    obj._dt = dt
+    return obj
 
-hash_cache: dict[int, str] = {}
 
-
-@dataclass
+@dataclass(slots=True)
 class CalEvent:
-  kind: str
   summary: str
   start: CalDateTime
   end: CalDateTime
+  kind: str = 'calendar#event'
   id: str|None = None
   etag: str|None = None
   htmlLink: str|None = None
   location: str|None = None
   description: str|None = None
   attachments: list[dict]|None = None
+  _field_names: ClassVar[tuple[str, ...]] = ()
   
   @classmethod
   def from_dict(cls, data: dict) -> Self:
-    return cls(**{
-      field.name: data[field.name]
-      for field in fields(cls)
-      if field.name in data
-    })
+    return cls(**{n: data[n] for n in cls._field_names if n in data})
+
+  def to_dict(self) -> dict:
+    """Convert to an API-ready dict, omitting unset fields."""
+    return {k: v for k, v in (
+      ('kind', self.kind),
+      ('summary', self.summary),
+      ('start', self.start.to_dict()),
+      ('end', self.end.to_dict()),
+      ('id', self.id),
+      ('etag', self.etag),
+      ('htmlLink', self.htmlLink),
+      ('location', self.location),
+      ('description', self.description),
+      ('attachments', self.attachments),
+    ) if v is not None}
 
   def __post_init__(self):
     if type(self.start) == dict:
@@ -86,11 +103,12 @@ class CalEvent:
     return f"{self.summary} @ {self.start.get_time().strftime('%b %d %H:%M')}"
 
   @property
-  def hash(self) -> str:
-    """Get a hash of the event, computing it if necessary."""
-    if not hash_cache.get(id(self)):
-      hash_cache[id(self)] = hashlib.sha1(str(self).encode()).hexdigest()
-    return hash_cache[id(self)]
+  def hash(self) -> tuple[str, datetime]:
+    """Content that identifies the event, regardless of its calendar ID."""
+    return (self.summary, self.start.get_time())
+
+
+CalEvent._field_names = tuple(f.name for f in fields(CalEvent))
 
 
 class GCal:
@@ -101,8 +119,13 @@ class GCal:
     self.now = datetime.now(tz=timezone.utc)
     self._service = None
     if not dry_run and credentials:
+      # imported here as the Google client libraries are slow to load
+      from google.oauth2.service_account import Credentials
+      from googleapiclient.discovery import build
       creds = Credentials.from_service_account_info(credentials)
-      self._service = build("calendar", "v3", credentials=creds)
+      # bundled discovery document, no network fetch at startup
+      self._service = build(
+        "calendar", "v3", credentials=creds, static_discovery=True)
   
 
   @property
@@ -138,11 +161,13 @@ class GCal:
     if self.dry_run:
       eprint('dry run - no events to delete')
       return
-    for event_id in event_ids:
-       self.service.events().delete(
+    self._execute_batch([
+      self.service.events().delete(
         calendarId=self.calendar_id,
         eventId=event_id,
-      ).execute()
+      )
+      for event_id in event_ids
+    ])
 
 
   def write_events(self, events: list[CalEvent]) -> list[CalEvent]:
@@ -150,16 +175,38 @@ class GCal:
     if self.dry_run:
       eprint('dry run - no events to write')
       return events
-    new_events = []
-    for event in events:
-      new_events.append(self.service.events().insert(
+    new_events = self._execute_batch([
+      self.service.events().insert(
         calendarId=self.calendar_id,
-        body=asdict(event),
+        body=event.to_dict(),
         supportsAttachments=True,
-      ).execute())
+      )
+      for event in events
+    ])
     return [CalEvent.from_dict(e) for e in new_events]
 
 
+  def _execute_batch(self, requests: list) -> list:
+    """Execute API requests in batches, returning responses in request order."""
+    responses: dict[int, Any] = {}
+    errors: list[Exception] = []
+
+    def callback(request_id, response, exception):
+      if exception is not None:
+        errors.append(exception)
+      else:
+        responses[int(request_id)] = response
+
+    for offset in range(0, len(requests), BATCH_SIZE):
+      batch = self.service.new_batch_http_request(callback=callback)
+      for i, request in enumerate(requests[offset:offset + BATCH_SIZE], offset):
+        batch.add(request, request_id=str(i))
+      batch.execute()
+      if errors:
+        raise errors[0]
+    return [responses[i] for i in sorted(responses)]
+
+
   def list_calendars(self) -> list[str]:
     if self.dry_run:
       eprint('Dry run: would list calendars')
@@ -214,15 +261,6 @@ class GCal:
     return created_acl
 
 
-  def _delete_acl(self, rule_id):
-    """Delete an ACL rule."""
-    if self.dry_run:
-      eprint(f"Dry run: would delete ACL rule with ID: {rule_id}")
-      return
-    self.service.acl().delete(calendarId=self.calendar_id, ruleId=rule_id).execute()
-    eprint(f"ACL rule deleted: {rule_id}")
-
-
   def add_writer(self, email: str):
     """Add a user to the calendar ACL with the given email address."""
     created_rule = self._insert_acl({
@@ -237,18 +275,7 @@ class GCal:
 
   def remove_writer(self, email: str):
     """Remove a user from the calendar ACL with the given email address."""
-    if self.dry_run:
-      eprint(f"Dry run: would remove user {email} from calendar ACL")
-      return
-    acls = self.get_acls()
-    for acl in acls:
-      scope = acl['scope']
-      if scope['type'] == 'user' and scope['value'] == email:
-        rule_id = acl['id']
-        self._delete_acl(rule_id)
-        eprint(f"User {email} removed from ACL")
-        return
-    raise GenericError(f"User {email} not found in ACL")
+    self.remove_users([email], 'writer')
 
 
   def add_owner(self, email: str):
@@ -265,16 +292,35 @@ class GCal:
 
   def remove_owner(self, email: str):
     """Remove an owner from the calendar ACL with the given email address."""
+    self.remove_users([email], 'owner')
+
+
+  def remove_users(self, emails: list[str], role: str|None = None):
+    """
+    Remove users from the calendar ACL with the given email addresses.
+
+    If a role is given, only rules granting that role are matched. The ACL
+    is read once and all rules are deleted in batched requests.
+    """
+    emails = list(dict.fromkeys(emails))
     if self.dry_run:
-      eprint(f"Dry run: would remove owner {email} from calendar ACL")
+      eprint(f"Dry run: would remove users {emails} from calendar ACL")
       return
-    acls = self.get_acls()
-    for acl in acls:
+    rule_ids: dict[str, str] = {}
+    for acl in self.get_acls():
       scope = acl['scope']
-      if scope['type'] == 'user' and scope['value'] == email and acl['role'] == 'owner':
-        rule_id = acl['id']
-        self._delete_acl(rule_id)
-        eprint(f"Owner {email} removed from ACL")
-        return
-    raise GenericError(f"Owner {email} not found in ACL")
+      if scope['type'] == 'user' and (role is None or acl['role'] == role):
+        rule_ids[scope['value']] = acl['id']
+    missing = [email for email in emails if email not in rule_ids]
+    if missing:
+      raise GenericError(f"User(s) {', '.join(missing)} not found in ACL")
+    self._execute_batch([
+      self.service.acl().delete(
+        calendarId=self.calendar_id,
+        ruleId=rule_ids[email],
+      )
+      for email in emails
+    ])
+    for email in emails:
+      eprint(f"User {email} removed from ACL")
 
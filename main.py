@@ -33,53 +33,83 @@ Environment variables:
 See --help for more options.
 """
 
-from dataclasses import dataclass, asdict, field, fields
+from dataclasses import dataclass, field, fields
 from datetime import datetime, timedelta, timezone
-from typing import Any, Self, ClassVar, Callable, Sequence, cast, NewType
-from urllib.error import URLError
+from typing import Any, Self, ClassVar, Callable, Sequence, cast, NewType, TYPE_CHECKING
 import argparse
-import gzip
-import io
-import json
+import functools
 import os
 import re
 import sys
-import urllib.request
 
-from bs4 import BeautifulSoup, Tag
-from dotenv import load_dotenv
+import orjson
 
 from google_cal import eprint, GCal, CalEvent, GenericError, CalDateTime
 
+# Heavier dependencies are imported where they are used, keeping startup
+# fast for commands that don't need them.
+if TYPE_CHECKING:
+  from bs4 import Tag
+  import requests
+
 # https://en.wikipedia.org/wiki/ISO_8601#Durations
 units = {'H': 3600, 'M': 60, 'S': 1}
 
+_RE_LINEWRAP = re.compile(r'(?<!\n)\n(?!\n)')
+_RE_SPACE = re.compile(r' +')
+_RE_LDJSON = re.compile(
+  r'<script[^>]+application/ld\+json[^>]*>(.*?)</script>', re.S | re.I)
+
 # Green Light Cinema Showtimes Page
 SHOWTIMES_URL = "https://ticketing.useast.veezi.com/sessions/?siteToken=kegxkyy004b7bm6apwhtgcm274"
 DEFAULT_CAL_TITLE = 'Green Light Cinema Showtimes'
+NOT_RATED_DESC = 'This film is Not Rated.'
+
+# Last fetched showtimes page, revalidated against the server on each fetch
+CACHE_DIR = os.path.join(
+  os.getenv('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'greenlight_cal')
+CACHE_HTML_FILE = os.path.join(CACHE_DIR, 'showtimes.html')
+CACHE_META_FILE = os.path.join(CACHE_DIR, 'showtimes.meta.json')
+
+# Accept-Encoding is left to requests so it only offers codecs it can decode.
+REQUEST_HEADERS = {
+  "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36",
+  "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+  "Accept-Language": "en-US,en;q=0.9",
+}
+
+# Sentinel for options missing from the parsed CLI arguments
+_MISSING = object()
 
 
-@dataclass
+@dataclass(slots=True)
 class Context:
   """Singleton context for shared state."""
   calendar: GCal
   cli_args: Any
   instance: ClassVar[Self|None] = None
+  _field_names: ClassVar[tuple[str, ...]] = ()
   now: datetime = field(default_factory=lambda: datetime.now(tz=timezone.utc))
 
   dry_run: bool = False
   calendar_file: str|None = None
   showtimes_file: str|None = None
   showtimes_html_file: str|None = None
+  no_cache: bool = False
 
   def __post_init__(self):
     self.__class__.instance = self
-    for field in fields(self.__class__):
-      if hasattr(self.cli_args, field.name):
-        setattr(self, field.name, getattr(self.cli_args, field.name))
+    cli_args = self.cli_args
+    for name in self._field_names:
+      value = getattr(cli_args, name, _MISSING)
+      if value is not _MISSING:
+        setattr(self, name, value)
 
 
-@dataclass
+Context._field_names = tuple(f.name for f in fields(Context))
+
+
+@dataclass(slots=True, frozen=True)
 class ShowtimeListing:
   """Listings read from the showtimes webpage"""
   title: str
@@ -88,17 +118,22 @@ class ShowtimeListing:
   rating_desc: str
 
 
-def pjson(json_data: Any, **kwargs):
+def pjson(json_data: Any, option: int = 0):
   """Pretty JSON Formatter"""
-  return json.dumps(json_data, indent=2, **kwargs)
+  return orjson.dumps(json_data, option=orjson.OPT_INDENT_2 | option).decode()
 
 
-def ppjson(json_data: Any, **kwargs):
+def ppjson(json_data: Any, option: int = 0):
   """Pretty JSON Printer"""
-  print(pjson(json_data, **kwargs))
+  print(pjson(json_data, option))
+
 
+def events_to_dicts(events: list[CalEvent]) -> list[dict]:
+  """Convert events to JSON-serializable dicts."""
+  return [e.to_dict() for e in events]
 
-def tag_to_text(tag: Tag|None) -> str:
+
+def tag_to_text(tag: 'Tag|None') -> str:
   """
   HTML tag to plain text, with normalized newlines.
   
@@ -108,11 +143,23 @@ def tag_to_text(tag: Tag|None) -> str:
   if tag is None:
     return ''
   text = tag.get_text(separator=' ', strip=True)
-  text = re.sub(r'(?:[^\n])\n(?:[^\n])', ' ', text)
-  text = re.sub(r'[ ]+', ' ', text)
+  text = _RE_LINEWRAP.sub(' ', text)
+  text = _RE_SPACE.sub(' ', text)
   return text
 
 
+def _iso_dur_seconds(duration: str) -> int:
+  """Total seconds of an ISO 8601 time duration such as 'PT1H30M'."""
+  total = n = 0
+  for c in duration:
+    if c.isdigit():
+      n = n * 10 + int(c)
+    elif n:
+      total += n * units[c]
+      n = 0
+  return total
+
+
 def calendar_get_acls(cal: GCal):
   acls = cal.get_acls()
   ppjson([
@@ -124,8 +171,8 @@ def calendar_get_acls(cal: GCal):
 def read_calendar_events(ctx: Context, cal: GCal) -> list[CalEvent]:
   """Read events from the calendar."""
   if ctx.calendar_file:
-    with open(ctx.calendar_file, 'r') as f:
-      data = json.load(f)
+    with open(ctx.calendar_file, 'rb') as f:
+      data = orjson.loads(f.read())
     return [CalEvent.from_dict(item) for item in data]
   if ctx.dry_run:
     raise GenericError("Error: no calendar file provided for dry run.")
@@ -133,7 +180,7 @@ def read_calendar_events(ctx: Context, cal: GCal) -> list[CalEvent]:
 
 
 def print_calendar_events(ctx: Context, cal: GCal) -> None:
-  ppjson([asdict(e) for e in read_calendar_events(ctx, cal)])
+  ppjson(events_to_dicts(read_calendar_events(ctx, cal)))
 
 
 def delete_events(ctx: Context, cal: GCal, event_ids: list[str]):
@@ -156,15 +203,24 @@ def write_events(ctx: Context, cal: GCal, events: list[CalEvent]):
 def read_showtimes(ctx: Context) -> list[CalEvent]:
   """Read showtimes from the listing site."""
   if ctx.showtimes_file:
-    with open(ctx.showtimes_file, 'r') as f:
-      data = json.load(f)
+    with open(ctx.showtimes_file, 'rb') as f:
+      data = orjson.loads(f.read())
     return [CalEvent.from_dict(item) for item in data]
   html = load_listing_site(ctx)
   return parse_showtimes(html)
 
 
 def print_showtimes(ctx: Context) -> None:
-  ppjson([asdict(e) for e in read_showtimes(ctx)])
+  ppjson(events_to_dicts(read_showtimes(ctx)))
+
+
+@functools.cache
+def http_session() -> 'requests.Session':
+  """Shared HTTP session, reusing connections and decoding compressed responses."""
+  import requests
+  session = requests.Session()
+  session.headers.update(REQUEST_HEADERS)
+  return session
 
 
 def load_listing_site(ctx: Context) -> str:
@@ -173,44 +229,102 @@ def load_listing_site(ctx: Context) -> str:
       return f.read()
   if ctx.dry_run:
     raise GenericError("Error: no showtimes JSON or HTML file provided for dry run. Provide one via --showtimes_file or --showtimes_html_file argument.")
-  headers={
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.9",
-    "Accept-Encoding": "gzip, deflate, br",
-    "Connection": "keep-alive",
-  }
+  import requests
+  headers = {} if ctx.no_cache else cached_listing_headers()
   try:
-    req = urllib.request.Request(SHOWTIMES_URL, headers=headers)
-    with urllib.request.urlopen(req) as res:
-      if res.getheader('Content-Encoding') == 'gzip':
-        with io.BytesIO(res.read()) as buf:
-          with gzip.GzipFile(fileobj=buf) as f:
-            return f.read().decode()
-      return res.read()
-  except URLError as e:
+    res = http_session().get(SHOWTIMES_URL, headers=headers, timeout=30)
+    if res.status_code == 304:
+      try:
+        with open(CACHE_HTML_FILE, 'r', encoding='utf-8') as f:
+          return f.read()
+      except OSError as e:
+        # cached copy is unusable, fetch the page again unconditionally
+        eprint(f"Unable to read cached showtimes page: {e}")
+        res = http_session().get(SHOWTIMES_URL, timeout=30)
+    res.raise_for_status()
+    html = res.content.decode()
+  except requests.RequestException as e:
     raise GenericError(f"Error fetching {SHOWTIMES_URL}: {e}")
+  if not ctx.no_cache:
+    save_listing_cache(html, res.headers.get('ETag'), res.headers.get('Last-Modified'))
+  return html
+
+
+def cached_listing_headers() -> dict[str, str]:
+  """Conditional request headers for the cached showtimes page, if any."""
+  if not os.path.exists(CACHE_HTML_FILE):
+    return {}
+  try:
+    with open(CACHE_META_FILE, 'rb') as f:
+      meta = orjson.loads(f.read())
+  except (OSError, orjson.JSONDecodeError):
+    return {}
+  headers = {}
+  if meta.get('etag'):
+    headers['If-None-Match'] = meta['etag']
+  if meta.get('last_modified'):
+    headers['If-Modified-Since'] = meta['last_modified']
+  return headers
+
+
+def save_listing_cache(html: str, etag: str|None, last_modified: str|None):
+  """Cache the showtimes page when the server supports revalidating it."""
+  if not etag and not last_modified:
+    # nothing to revalidate with, drop any stale copy and its validators
+    for path in (CACHE_HTML_FILE, CACHE_META_FILE):
+      try:
+        os.remove(path)
+      except FileNotFoundError:
+        pass
+      except OSError as e:
+        eprint(f"Unable to clear cached showtimes page: {e}")
+    return
+  try:
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(CACHE_HTML_FILE, 'w', encoding='utf-8') as f:
+      f.write(html)
+    with open(CACHE_META_FILE, 'wb') as f:
+      f.write(orjson.dumps({'etag': etag, 'last_modified': last_modified}))
+  except OSError as e:
+    eprint(f"Unable to cache showtimes page: {e}")
 
 
 def parse_showtimes(html_src: str) -> list[CalEvent]:
   """Given the HTML of the showtimes page, return a list of calendar events."""
   listings: list[CalEvent] = []
   films: dict[str, ShowtimeListing] = {}
-  parser = BeautifulSoup(html_src, 'html.parser')
+  showtimes: dict[tuple, dict] = {}
+  from bs4 import BeautifulSoup, SoupStrainer
+  # only the film listings need a DOM, the ld+json blocks are read directly
+  parser = BeautifulSoup(
+    html_src, 'lxml', parse_only=SoupStrainer(id='sessionsByFilmConent'))
   for film in parser.select('#sessionsByFilmConent .film'):
-    film_data = {}
-    censor = film.select_one('.censor')
+    # one walk of the film subtree, keeping the first match for each class
+    nodes: dict[str, Tag] = {}
+    for node in film.select('.title, .film-desc, .censor'):
+      for name in node.get_attribute_list('class'):
+        nodes.setdefault(name, node)
+    censor = nodes.get('censor')
+    rating_desc = tag_to_text(censor.parent) if censor else ''
     data = ShowtimeListing(
-      title = tag_to_text(film.select_one('.title')),
-      desc = tag_to_text(film.select_one('.film-desc')),
+      title = tag_to_text(nodes.get('title')),
+      desc = tag_to_text(nodes.get('film-desc')),
       rating = tag_to_text(censor),
-      rating_desc = tag_to_text(censor.parent) if censor else '',
+      rating_desc = NOT_RATED_DESC if rating_desc == 'NR' else rating_desc,
     )
     films[data.title] = data
-    if data.rating_desc == 'NR':
-      data.rating_desc = 'This film is Not Rated.'
 
-  for script in parser.find_all('script', {'type': 'application/ld+json'}):
+  blocks = []
+  for blob in _RE_LDJSON.findall(html_src):
+    if not blob:
+      continue
+    try:
+      blocks.append(orjson.loads(blob))
+    except orjson.JSONDecodeError as e:
+      # bad json
+      eprint(f"Error decoding JSON: {e}")
+
+  for obj in blocks:
     # [{
     #   "@type":"VisualArtsEvent",
     #   "startDate":"2026-01-28T14:00:00-05:00",
@@ -224,12 +338,6 @@ def parse_showtimes(html_src: str) -> list[CalEvent]:
     #   "url":"https://ticketing.useast.veezi.com/purchase/3192?siteToken=kegxkyy004b7bm6apwhtgcm274",
     #   "@context":"http://schema.org"
     # }, ...]
-    try:
-      obj = json.loads(script.string or '[]')
-    except json.JSONDecodeError as e:
-      # bad json
-      eprint(f"Error decoding JSON: {e}")
-      continue
     if not isinstance(obj, list):
       # not a list of showtimes
       continue
@@ -237,24 +345,44 @@ def parse_showtimes(html_src: str) -> list[CalEvent]:
       if not isinstance(item, dict) or item.get('@type') != 'VisualArtsEvent':
         # not a showtime
         continue
-      try:
-        showtime = films[item['name']]
-        endDate = datetime.fromisoformat(item['startDate'])
-        for m in re.findall(r'(\d+)([A-Z])', item['duration']):
-          endDate += timedelta(seconds=int(m[0]) * units[m[1]])
-        listings.append(CalEvent(
-            kind="calendar#event",
-            summary=f"{item['name']} @ {item['location']['name']}",
-            location=item['location']['address'],
-            start=CalDateTime(dateTime=item['startDate']),
-            end=CalDateTime(dateTime=endDate.isoformat()),
-            description=f"{item['url']}\n\n{showtime.desc}\n\nRating: {showtime.rating_desc}",
-        ))
-      except KeyError as e:
-        GenericError(f"KeyError processing item: {item}, error: {e}")
+      # the same showtime may be listed by more than one script block, key on
+      # the same content that makes up the event summary and start
+      location = item.get('location')
+      venue = location.get('name') if isinstance(location, dict) else None
+      showtimes.setdefault((item.get('name'), venue, item.get('startDate')), item)
+
+  for item in showtimes.values():
+    try:
+      showtime = films[item['name']]
+      startDate = datetime.fromisoformat(item['startDate'])
+      endDate = startDate + timedelta(
+        seconds=_iso_dur_seconds(item['duration']))
+      address = item['location']['address']
+      if isinstance(address, str):
+        address = sys.intern(address)
+      listings.append(CalEvent(
+          summary=f"{item['name']} @ {item['location']['name']}",
+          location=address,
+          start=CalDateTime.from_datetime(startDate),
+          end=CalDateTime.from_datetime(endDate),
+          description=f"{item['url']}\n\n{showtime.desc}\n\nRating: {showtime.rating_desc}",
+      ))
+    except KeyError as e:
+      GenericError(f"KeyError processing item: {item}, error: {e}")
   return listings
 
 
+async def read_sources(
+    ctx: Context, cal: GCal) -> tuple[list[CalEvent], list[CalEvent]]:
+  """Read calendar events and showtimes concurrently."""
+  import asyncio
+  cal_events, showtimes = await asyncio.gather(
+    asyncio.to_thread(read_calendar_events, ctx, cal),
+    asyncio.to_thread(read_showtimes, ctx),
+  )
+  return cal_events, showtimes
+
+
 def update_events(ctx: Context, cal: GCal) -> None:
   """
   Diff published and fresh showtimes.
@@ -262,27 +390,29 @@ def update_events(ctx: Context, cal: GCal) -> None:
   NOTE: will only update calenar entries within the time window of the
   showtimes listings.
   """
-  cal_events = read_calendar_events(ctx, cal)
-  showtimes = read_showtimes(ctx)
+  import asyncio
+  cal_events, showtimes = asyncio.run(read_sources(ctx, cal))
+
+  if not showtimes:
+    eprint('no showtimes found')
+    return
 
-  to_create: list[CalEvent] = []
-  to_delete: list[CalEvent] = []
+  st_map: dict[tuple, CalEvent] = {}
+  start_time = end_time = showtimes[0].start.get_time()
+  for e in showtimes:
+    st_map[e.hash] = e
+    dt = e.start.get_time()
+    if dt < start_time:
+      start_time = dt
+    elif dt > end_time:
+      end_time = dt
   cal_map = {e.hash: e for e in cal_events}
-  st_map = {e.hash: e for e in showtimes}
-  start_time = min([e.start.get_time() for e in showtimes])
-  end_time = max([e.start.get_time() for e in showtimes])
-  for key, event in st_map.items():
-    dt = event.start.get_time()
-    if dt < start_time > dt  or dt > end_time:
-      continue
-    if key not in cal_map:
-      to_create.append(event)
-  for key, event in cal_map.items():
-    dt = event.start.get_time()
-    if dt < start_time or dt > end_time:
-      continue
-    if key not in st_map:
-      to_delete.append(event)
+  # showtimes define the window, so all of them fall inside it
+  to_create = [e for key, e in st_map.items() if key not in cal_map]
+  to_delete = [
+    e for key, e in cal_map.items()
+    if key not in st_map and start_time <= e.start.get_time() <= end_time
+  ]
   if to_create:
     eprint(f'added events: {pjson([
       f'{e} {e.htmlLink}' 
@@ -348,16 +478,16 @@ def calendar_argparse(calendar_parser: argparse.ArgumentParser):
     help='Add a user to the calendar ACL with the given email address.')
 
   calendar_parser.add_argument(
-    '--remove_writer', **arg_str(lambda x, c, n: c.remove_writer(n)),
-    help='Remove a user from the calendar ACL with the given email address.')
+    '--remove_writer', **arg_list(lambda x, c, n: c.remove_users(n, 'writer')),
+    help='Remove writers from the calendar ACL with the given email addresses.')
 
   calendar_parser.add_argument(
     '--add_owner', **arg_str(lambda x, c, n: c.add_owner(n)),
     help='Add an owner to the calendar ACL with the given email address.')
 
   calendar_parser.add_argument(
-    '--remove_owner', **arg_str(lambda x, c, n: c.remove_owner(n)),
-    help='Remove an owner from the calendar ACL with the given email address.')
+    '--remove_owner', **arg_list(lambda x, c, n: c.remove_users(n, 'owner')),
+    help='Remove owners from the calendar ACL with the given email addresses.')
 
 
 def events_argparse(event_parser: argparse.ArgumentParser):
@@ -394,6 +524,10 @@ def main(nargs: list[str]):
     '--credentials_file', type=str,
     help='Path to the service account credentials JSON file. Can be omitted if CREDENTIALS_FILE environment variable is set or specified in .env file.')
 
+  parser.add_argument(
+    '--no_cache', action='store_true',
+    help='Always download the showtimes page instead of revalidating the locally cached copy.')
+
   # Testing arguments
   tests = parser.add_argument_group('Testing Arguments')
   tests.add_argument(
@@ -421,13 +555,13 @@ def main(nargs: list[str]):
   
   credentials = None
   if os.getenv('CREDENTIALS_JSON'):
-    credentials = json.loads(cast(str, os.getenv('CREDENTIALS_JSON')))
+    credentials = orjson.loads(cast(str, os.getenv('CREDENTIALS_JSON')))
   elif args.credentials_file:
-    with open(args.credentials_file, 'r') as fp:
-      credentials = json.loads(fp.read())
+    with open(args.credentials_file, 'rb') as fp:
+      credentials = orjson.loads(fp.read())
   elif os.getenv('CREDENTIALS_FILE'):
-    with open(cast(str, os.getenv('CREDENTIALS_FILE')), 'r') as fp:
-      credentials = json.loads(fp.read())
+    with open(cast(str, os.getenv('CREDENTIALS_FILE')), 'rb') as fp:
+      credentials = orjson.loads(fp.read())
 
   cal = GCal(calendar_id, credentials, args.dry_run)
   ctx = Context(calendar=cal, cli_args=args)
@@ -442,6 +576,7 @@ def main(nargs: list[str]):
 
 
 if __name__ == "__main__":
+  from dotenv import load_dotenv
   load_dotenv()
   try:
     main(sys.argv[1:])